@@ -1,13 +1,15 @@
 import argparse
-import json
 import os
-from datetime import datetime
-from statistics import mean
+
+import numpy as np
+import orjson
+import pandas as pd
 
 LOG_FILE = os.path.join("logs", "games.jsonl")
 
-GOOD_BUCKETS = {"Hot", "Warm"}
-BAD_BUCKETS = {"Cool", "Cold", "Freezing"}
+# bucket -> int8 code; Hot/Warm are good moves, Cool/Cold/Freezing bad ones
+BUCKET_CODES = {"Hot": 0, "Warm": 1, "Cool": 2, "Cold": 3, "Freezing": 4}
+GOOD_MAX_CODE = 1
 
 
 def load_logs(path: str):
@@ -16,78 +18,84 @@ def load_logs(path: str):
         print(f"No log file found at {path}")
         return games
 
-    with open(path, "r", encoding="utf-8") as f:
+    # orjson parses bytes directly; blank lines fail to parse like bad ones
+    with open(path, "rb") as f:
         for line in f:
-            line = line.strip()
-            if not line:
-                continue
             try:
-                games.append(json.loads(line))
-            except json.JSONDecodeError:
+                games.append(orjson.loads(line))
+            except orjson.JSONDecodeError:
                 continue
     return games
 
 
-def game_metrics(game):
+def games_frame(games):
     """
-    Compute simple quality metrics for one game.
-    Returns dict with: moves, good_ratio, bad_ratio, good_count, bad_count.
+    Build one row per game with its filter fields and quality metrics:
+    moves, good_ratio, bad_ratio, good_count, bad_count.
+    Ratios are NaN for games without per-move data.
     """
-    moves = game.get("moves", [])
-    if not moves:
-        return None
-
-    good = 0
-    bad = 0
-    for m in moves:
-        b = m.get("bucket")
-        if b in GOOD_BUCKETS:
-            good += 1
-        elif b in BAD_BUCKETS:
-            bad += 1
-
-    total = len(moves)
-    if total == 0:
-        return None
-
-    return {
-      "moves": total,
-      "good_ratio": good / total,
-      "bad_ratio": bad / total,
-      "good_count": good,
-      "bad_count": bad,
-    }
+    move_lists = [g.get("moves") or [] for g in games]
+    lengths = np.fromiter((len(ms) for ms in move_lists), dtype=np.int64, count=len(games))
+
+    # every move of every game as one flat array of bucket codes (-1 = unknown)
+    codes = np.fromiter(
+        (BUCKET_CODES.get(m.get("bucket"), -1) for ms in move_lists for m in ms),
+        dtype=np.int8,
+        count=int(lengths.sum()),
+    )
+    game_idx = np.repeat(np.arange(len(games)), lengths)
+
+    good = np.bincount(game_idx, weights=(codes >= 0) & (codes <= GOOD_MAX_CODE),
+                       minlength=len(games)).astype(np.int64)
+    bad = np.bincount(game_idx, weights=codes > GOOD_MAX_CODE,
+                      minlength=len(games)).astype(np.int64)
+
+    total = np.where(lengths > 0, lengths, np.nan)
+
+    return pd.DataFrame({
+        "clientId": [g.get("clientId") for g in games],
+        "difficulty": [g.get("difficulty") for g in games],
+        "mode": [g.get("mode") for g in games],
+        "startedAt": pd.Series([g.get("startedAt") or "" for g in games], dtype=object),
+        "result": pd.Series([g.get("result") for g in games], dtype=object),
+        "moves": lengths,
+        "good_count": good,
+        "bad_count": bad,
+        "good_ratio": good / total,
+        "bad_ratio": bad / total,
+    })
+
+
+def filter_games(df, difficulty=None, mode=None):
+    """Keep games matching difficulty / mode (a falsy filter matches all)."""
+    mask = np.ones(len(df), dtype=bool)
+    if difficulty:
+        mask &= (df["difficulty"] == difficulty).to_numpy()
+    if mode:
+        mask &= (df["mode"] == mode).to_numpy()
+    return df[mask]
 
 
 def short_time(ts: str):
-    try:
-        dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
-        return dt.strftime("%Y-%m-%d %H:%M")
-    except Exception:
-        return ts
+    # startedAt is ISO-8601 ("2024-01-02T15:04:05.000Z"); slice out
+    # "YYYY-MM-DD HH:MM" instead of parsing, anything else is shown as-is
+    if isinstance(ts, str) and len(ts) >= 16 and ts[10] in "T ":
+        return ts[:10] + " " + ts[11:16]
+    return ts
 
 
-def print_client_overview(games, difficulty=None, mode=None):
+def print_client_overview(df, difficulty=None, mode=None):
     """
     When no client-id is passed, show how many games each client has,
     filtered by difficulty / mode.
     """
-    per_client = {}
-
-    for g in games:
-        if difficulty and g.get("difficulty") != difficulty:
-            continue
-        if mode and g.get("mode") != mode:
-            continue
-
-        cid = g.get("clientId", "UNKNOWN")
-        per_client.setdefault(cid, 0)
-        per_client[cid] += 1
-
-    if not per_client:
+    filtered = filter_games(df, difficulty, mode)
+    if filtered.empty:
         print("No games matched the filters yet.")
         return
 
+    per_client = filtered["clientId"].fillna("UNKNOWN").value_counts(sort=False)
+
     print("Clients found in log (with given filters):")
     for cid, n in per_client.items():
         print(f"  {cid}: {n} games")
@@ -97,24 +105,19 @@ def print_client_overview(games, difficulty=None, mode=None):
     print()
 
 
-def analyze_for_client(games, client_id, difficulty=None, mode="computer"):
+def analyze_for_client(df, client_id, difficulty=None, mode="computer"):
     # Filter by client, difficulty, and mode
-    filtered = []
-    for g in games:
-        if g.get("clientId") != client_id:
-            continue
-        if difficulty and g.get("difficulty") != difficulty:
-            continue
-        if mode and g.get("mode") != mode:
-            continue
-        filtered.append(g)
+    filtered = filter_games(df[df["clientId"] == client_id], difficulty, mode)
 
-    if not filtered:
+    if filtered.empty:
         print("No games found for that filter.")
         return
 
-    # Sort chronologically by startedAt
-    filtered.sort(key=lambda g: g.get("startedAt", ""))
+    # Sort chronologically by startedAt as real timestamps, so mixed
+    # offsets / precisions order correctly; missing times (NaT) sort first
+    started = pd.to_datetime(filtered["startedAt"], utc=True, errors="coerce", format="ISO8601")
+    order = np.argsort(started.dt.tz_convert(None).to_numpy().view("int64"), kind="stable")
+    filtered = filtered.iloc[order]
 
     print(f"Client:     {client_id}")
     print(f"Mode:       {mode}")
@@ -122,22 +125,20 @@ def analyze_for_client(games, client_id, difficulty=None, mode="computer"):
     print(f"Games:      {len(filtered)}")
     print()
 
-    per_game = []
-    for idx, g in enumerate(filtered, start=1):
-        metrics = game_metrics(g)
-        if not metrics:
+    for idx, g in enumerate(filtered.itertuples(index=False), start=1):
+        if g.moves == 0:
             continue
-        per_game.append(metrics)
-        started = short_time(g.get("startedAt", ""))
-        result = g.get("result") or "-"
+        started = short_time(g.startedAt)
+        result = g.result or "-"
         print(
             f"Game {idx:2d} | {started} | result {result:7s} | "
-            f"moves {metrics['moves']:3d} | "
-            f"good {metrics['good_ratio']*100:5.1f}% | "
-            f"bad {metrics['bad_ratio']*100:5.1f}%"
+            f"moves {g.moves:3d} | "
+            f"good {g.good_ratio*100:5.1f}% | "
+            f"bad {g.bad_ratio*100:5.1f}%"
         )
 
-    if not per_game:
+    per_game = filtered[filtered["moves"] > 0]
+    if per_game.empty:
         print("No per-move data available.")
         return
 
@@ -146,22 +147,22 @@ def analyze_for_client(games, client_id, difficulty=None, mode="computer"):
     n = len(per_game)
     split = max(1, n // 2)     # first half vs second half of *actual* games
 
-    early = per_game[:split]
-    late = per_game[split:]
+    good_ratios = per_game["good_ratio"].to_numpy()
+    bad_ratios = per_game["bad_ratio"].to_numpy()
 
-    def avg(field, games_list):
-        return mean(g[field] for g in games_list) if games_list else 0.0
+    def avg(ratios):
+        return ratios.mean() if ratios.size else 0.0
 
-    early_good = avg("good_ratio", early)
-    late_good = avg("good_ratio", late)
-    early_bad = avg("bad_ratio", early)
-    late_bad = avg("bad_ratio", late)
+    early_good = avg(good_ratios[:split])
+    late_good = avg(good_ratios[split:])
+    early_bad = avg(bad_ratios[:split])
+    late_bad = avg(bad_ratios[split:])
 
-    print(f"Early games (first {len(early)}):")
+    print(f"Early games (first {split}):")
     print(f"  Avg good moves: {early_good*100:5.1f}%")
     print(f"  Avg bad moves : {early_bad*100:5.1f}%")
     print()
-    print(f"Late games (last {len(late)}):")
+    print(f"Late games (last {n - split}):")
     print(f"  Avg good moves: {late_good*100:5.1f}%")
     print(f"  Avg bad moves : {late_bad*100:5.1f}%")
     print()
@@ -196,13 +197,15 @@ def main():
     if not games:
         return
 
+    df = games_frame(games)
+
     # If client-id not passed, overview of players
     if not args.client_id:
-        print_client_overview(games, difficulty=args.difficulty, mode=args.mode)
+        print_client_overview(df, difficulty=args.difficulty, mode=args.mode)
         return
 
     analyze_for_client(
-        games,
+        df,
         client_id=args.client_id,
         difficulty=args.difficulty,
         mode=args.mode,
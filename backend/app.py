@@ -1,53 +1,325 @@
 import os
 import atexit
-import subprocess
-import json
+import bisect
+import functools
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
 from datetime import datetime
 
 from flask import Flask, request, jsonify, send_from_directory
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import chess
 import chess.engine
+import orjson
 
 # ---------------- CONFIG ----------------
 
 STOCKFISH_PATH = os.getenv("STOCKFISH_PATH") or "/opt/homebrew/bin/stockfish"
-STOCKFISH_THREADS = int(os.getenv("STOCKFISH_THREADS", "2"))
+STOCKFISH_THREADS = int(os.getenv("STOCKFISH_THREADS", "1"))
+STOCKFISH_POOL_SIZE = int(os.getenv("STOCKFISH_POOL_SIZE", "4"))
+STOCKFISH_HASH_MB = int(os.getenv("STOCKFISH_HASH_MB", "64"))  # per engine
+# pin each engine to its own STOCKFISH_THREADS cores (Linux only); leave off
+# when several server processes share the machine, as they'd pin the same cores
+STOCKFISH_PIN_CPUS = os.getenv("STOCKFISH_PIN_CPUS", "0") == "1"
+ANALYSIS_CACHE_SIZE = int(os.getenv("ANALYSIS_CACHE_SIZE", "4096"))
+EVAL_MULTIPV = 8  # lines searched by eval-move; the user's move is usually among them
+EARLY_EXIT_MIN_DEPTH = 10    # best-move may stop early from this depth on...
+EARLY_EXIT_STABLE_DEPTHS = 3  # ...once the best move held this many depths
+HISTORY_SENSITIVE_HALFMOVES = 60  # fifty-move draws fall inside the search from here
+MAX_CLIENT_GAMES = int(os.getenv("MAX_CLIENT_GAMES", "1024"))
+MAX_BATCH_POSITIONS = 40  # eval-moves holds one engine for the whole batch
+MAX_BATCH_DEPTH = 16      # ...so cap how long each of its searches may run
+ASSET_MAX_AGE = 31536000  # 1 year; paths aren't versioned, so rename assets that change
 
 LOG_DIR = "logs"
 os.makedirs(LOG_DIR, exist_ok=True)
 LOG_FILE = os.path.join(LOG_DIR, "games.jsonl")
 
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes/decodes with orjson."""
+
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_SORT_KEYS if self.sort_keys else 0
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 app = Flask(__name__, static_url_path="", static_folder="static")
+app.json = OrjsonProvider(app)  # also used by request.get_json()
 
 CORS(app)  # Allow all origins
 
-_engine = None  # global engine instance
+_engines = []        # every engine started, for shutdown
+_free_engines = []   # engines currently free to use
+_engine_pool_lock = threading.Condition()
+
+# (position key, multipv) -> (depth searched, depth settled, [trimmed InfoDict]),
+# least recently used first; "settled" is the deepest early-exit request the
+# result answers (never less than the depth searched)
+_analysis_cache = OrderedDict()
+_analysis_cache_lock = threading.Lock()
+
+# clientId -> {"board": Board with move history, "engine": last engine used}
+_client_games = OrderedDict()
+_client_games_lock = threading.Lock()
 
 
 # ---------------- ENGINE MANAGEMENT ----------------
 
-def get_engine() -> chess.engine.SimpleEngine:
-    """Start Stockfish once and reuse it."""
-    global _engine
-    if _engine is None:
-        engine = chess.engine.SimpleEngine.popen_uci(STOCKFISH_PATH)
-        engine.configure({"Threads": STOCKFISH_THREADS})
-        _engine = engine
-    return _engine
+def engine_cpu_sets():
+    """
+    Disjoint sets of STOCKFISH_THREADS CPUs, one per pooled engine, or
+    None if pinning is off, unsupported, or there aren't enough CPUs.
+    """
+    if not STOCKFISH_PIN_CPUS or not hasattr(os, "sched_setaffinity"):
+        return None
+    cpus = sorted(os.sched_getaffinity(0))
+    if len(cpus) < STOCKFISH_POOL_SIZE * STOCKFISH_THREADS:
+        print(f"Not pinning engines: {len(cpus)} CPUs for "
+              f"{STOCKFISH_POOL_SIZE} x {STOCKFISH_THREADS} threads")
+        return None
+    return [set(cpus[i * STOCKFISH_THREADS:(i + 1) * STOCKFISH_THREADS])
+            for i in range(STOCKFISH_POOL_SIZE)]
+
+
+def pin_engine(engine: chess.engine.SimpleEngine, cpus: set):
+    """Restrict every thread of the engine process to 'cpus'."""
+    pid = engine.protocol.transport.get_pid()
+    # threads the engine starts later inherit the affinity
+    for tid in os.listdir(f"/proc/{pid}/task"):
+        os.sched_setaffinity(int(tid), cpus)
+
+
+def start_engines():
+    """Start the pool of Stockfish processes once and reuse them."""
+    if _engines:
+        return
+    with _engine_pool_lock:
+        if _engines:
+            return
+        # set once at startup and never changed mid-session; options the
+        # engine doesn't advertise are skipped rather than rejected
+        options = {
+            "Threads": STOCKFISH_THREADS,
+            "Hash": STOCKFISH_HASH_MB,
+            "UCI_AnalyseMode": True,
+        }
+        cpu_sets = engine_cpu_sets()
+        for i in range(STOCKFISH_POOL_SIZE):
+            engine = chess.engine.SimpleEngine.popen_uci(STOCKFISH_PATH)
+            if cpu_sets:
+                pin_engine(engine, cpu_sets[i])
+            engine.configure({k: v for k, v in options.items() if k in engine.options})
+            _engines.append(engine)
+            _free_engines.append(engine)
+
+
+@contextmanager
+def with_engine(preferred=None):
+    """
+    Borrow an engine from the pool for the duration of the block.
+    A SimpleEngine can only run one search at a time, so each
+    concurrent analysis needs its own. If 'preferred' is free it is
+    used, so a game keeps landing on the engine whose hash table
+    already holds its previous positions.
+    """
+    start_engines()
+    with _engine_pool_lock:
+        while not _free_engines:
+            _engine_pool_lock.wait()
+        engine = preferred if preferred in _free_engines else _free_engines[-1]
+        _free_engines.remove(engine)
+    try:
+        yield engine
+    finally:
+        with _engine_pool_lock:
+            _free_engines.append(engine)
+            _engine_pool_lock.notify()
 
 
 @atexit.register
-def shutdown_engine():
-    """Make sure the engine is shut down when the server stops."""
-    global _engine
-    if _engine:
+def shutdown_engines():
+    """Make sure every engine is shut down when the server stops."""
+    for engine in _engines:
         try:
-            _engine.quit()
+            engine.quit()
         except Exception:
             pass
 
 
+def position_key(fen: str) -> str:
+    """
+    Strip the halfmove/fullmove counters from a FEN.
+    Only placement, turn, castling and en passant matter to the search.
+    """
+    return " ".join(fen.split()[:4])
+
+
+@functools.lru_cache(maxsize=2048)
+def _parsed_board(fen: str) -> chess.Board:
+    return chess.Board(fen)
+
+
+def parse_board(fen: str) -> chess.Board:
+    """
+    Fresh Board for 'fen', copied from a cache of parsed FENs since
+    clients send the same FEN to several endpoints in a row.
+    """
+    return _parsed_board(fen).copy()
+
+
+def game_board(client_id, fen: str) -> chess.Board:
+    """
+    Board for 'fen', carrying the client's move history when 'fen' is
+    exactly the position we last saw in their game, move counters
+    included; a stale or unrelated stored game is never reused. The
+    engine then receives 'position fen <root> moves ...' instead of a
+    bare FEN.
+    """
+    if client_id:
+        with _client_games_lock:
+            game = _client_games.get(client_id)
+            board = game["board"] if game else None
+        # chess.js always writes the en passant square after a double
+        # push; python-chess only when a capture is legal
+        if board is not None and fen in (board.fen(), board.fen(en_passant="fen")):
+            return board.copy()
+    return parse_board(fen)
+
+
+def remember_game(client_id, board: chess.Board = None, engine=None):
+    """
+    Record the client's current game position and/or the engine that
+    last served them. The board must not be mutated afterwards.
+    """
+    if not client_id:
+        return
+    with _client_games_lock:
+        game = _client_games.setdefault(client_id, {"board": None, "engine": None})
+        if board is not None:
+            game["board"] = board
+        if engine is not None:
+            game["engine"] = engine
+        _client_games.move_to_end(client_id)
+        while len(_client_games) > MAX_CLIENT_GAMES:
+            _client_games.popitem(last=False)
+
+
+def client_engine(client_id):
+    """Engine that last analysed this client's game, if any."""
+    with _client_games_lock:
+        game = _client_games.get(client_id)
+        return game["engine"] if game else None
+
+
+def analyse_until_stable(engine: chess.engine.SimpleEngine,
+                         board: chess.Board,
+                         depth: int) -> chess.engine.InfoDict:
+    """
+    Search up to 'depth' but stop as soon as a mate is found or the best
+    move has stayed the same for EARLY_EXIT_STABLE_DEPTHS depths past
+    EARLY_EXIT_MIN_DEPTH. Each extra ply roughly doubles search time, so
+    easy positions return much sooner; hard ones still go the full depth.
+    """
+    best = None
+    with engine.analysis(board, chess.engine.Limit(depth=depth)) as analysis:
+        last_move = None
+        stable = 0
+        for info in analysis:
+            if "score" not in info or not info.get("pv"):
+                continue
+            if info["score"].is_mate():
+                best = info
+                break
+            if info["pv"][0] == last_move:
+                stable += 1
+                if (stable >= EARLY_EXIT_STABLE_DEPTHS
+                        and info.get("depth", 0) >= EARLY_EXIT_MIN_DEPTH):
+                    best = info
+                    break
+            else:
+                last_move = info["pv"][0]
+                stable = 0
+        if best is None:
+            best = dict(analysis.info)
+    return best
+
+
+def analyse_cached(board: chess.Board,
+                   depth: int,
+                   multipv: int = 1,
+                   client_id=None,
+                   early_exit: bool = False,
+                   engine=None) -> list:
+    """
+    Return the top 'multipv' engine lines for a position, reusing a
+    previous result for the same position and number of lines if it was
+    searched at least as deep. Only 'score' and 'pv' are kept.
+    With 'early_exit' a single-line search may stop before 'depth'
+    (see analyse_until_stable). It is cached with the depth it actually
+    reached and the depth it was asked for: later early-exit lookups may
+    reuse it up to the requested depth, full-depth callers only up to the
+    depth reached, so they never get a shallower answer.
+    An 'engine' the caller already holds is used instead of borrowing one.
+
+    Positions whose score depends on more than the counter-less FEN (a
+    repetition in the move history, or a high halfmove clock) are never
+    read from or written to the shared cache.
+
+    No 'game' is passed to the engine, so python-chess sends ucinewgame
+    only once per engine and the hash table carries over between moves.
+    """
+    # one entry per line count, so best-move and eval-move don't evict
+    # each other's results for the same position
+    key = (position_key(board.fen()), multipv)
+    shareable = (board.halfmove_clock < HISTORY_SENSITIVE_HALFMOVES
+                 and not board.is_repetition(2))
+
+    with _analysis_cache_lock:
+        hit = _analysis_cache.get(key) if shareable else None
+        if hit is not None and hit[1 if early_exit else 0] >= depth:
+            _analysis_cache.move_to_end(key)
+            return hit[2]
+
+    if engine is not None:
+        borrowed = nullcontext(engine)
+    else:
+        borrowed = with_engine(client_engine(client_id))
+    searched = depth
+    with borrowed as engine:
+        if early_exit and multipv == 1:
+            infos = [analyse_until_stable(engine, board, depth)]
+            searched = min(depth, infos[0].get("depth", depth))
+        else:
+            infos = engine.analyse(board,
+                                   chess.engine.Limit(depth=depth),
+                                   multipv=multipv)
+    remember_game(client_id, engine=engine)
+    result = [{"score": info["score"], "pv": info.get("pv", [])} for info in infos]
+    if not shareable:
+        return result
+
+    with _analysis_cache_lock:
+        hit = _analysis_cache.get(key)
+        if hit is None:
+            _analysis_cache[key] = (searched, depth, result)
+        elif hit[0] < searched:
+            _analysis_cache[key] = (searched, max(depth, hit[1]), result)
+        else:
+            _analysis_cache[key] = (hit[0], max(depth, hit[1]), hit[2])
+        _analysis_cache.move_to_end(key)
+        while len(_analysis_cache) > ANALYSIS_CACHE_SIZE:
+            _analysis_cache.popitem(last=False)
+
+    return result
+
+
 def cp_from(info: chess.engine.InfoDict, pov: chess.Color) -> int:
     """Return score in centipawns from pov (mate scaled to big cp)."""
     s = info["score"].pov(pov)
@@ -56,33 +328,38 @@ def cp_from(info: chess.engine.InfoDict, pov: chess.Color) -> int:
 
 def material_score(board: chess.Board, color: chess.Color) -> int:
     """Very simple material score (only pieces, no pawn structure)."""
-    values = {
-        chess.PAWN: 100,
-        chess.KNIGHT: 320,
-        chess.BISHOP: 330,
-        chess.ROOK: 500,
-        chess.QUEEN: 900,
-    }
-    score = 0
-    for ptype, val in values.items():
-        score += len(board.pieces(ptype, color)) * val
-    return score
+    # popcount straight off the bitboards instead of building SquareSets
+    occ = board.occupied_co[color]
+    return (100 * (board.pawns & occ).bit_count()
+            + 320 * (board.knights & occ).bit_count()
+            + 330 * (board.bishops & occ).bit_count()
+            + 500 * (board.rooks & occ).bit_count()
+            + 900 * (board.queens & occ).bit_count())
+
 
+# bitboard of the king's file and its neighbours, per king file
+KING_SHELTER_FILES = [
+    chess.BB_FILES[max(0, f - 1)] | chess.BB_FILES[f] | chess.BB_FILES[min(7, f + 1)]
+    for f in range(8)
+]
 
-def explain_move(board_before: chess.Board,
-                 board_after: chess.Board,
+
+def explain_move(board: chess.Board,
                  move: chess.Move,
                  delta_cp: int,
                  bucket: str) -> str:
     """
     Simple heuristic explanation for why a move is good/bad.
     Not a full chess coach, but enough for a student prototype.
+    'board' is the position before the move and is left unchanged.
     """
-    color = board_before.turn
+    color = board.turn
     opp = not color
 
-    mat_before = material_score(board_before, color) - material_score(board_before, opp)
-    mat_after = material_score(board_after, color) - material_score(board_after, opp)
+    mat_before = material_score(board, color) - material_score(board, opp)
+    board.push(move)
+    mat_after = material_score(board, color) - material_score(board, opp)
+    board.pop()
     mat_delta = mat_after - mat_before
 
     # Big material loss
@@ -93,14 +370,12 @@ def explain_move(board_before: chess.Board,
     if delta_cp <= -300:
         return "This move allows the opponent strong tactical or positional chances."
 
-    # Very rough king-safety heuristic
-    king_sq = board_before.king(color)
-    if king_sq is not None:
-        piece = board_before.piece_at(move.from_square)
-        if piece and piece.piece_type == chess.PAWN:
-            if abs(chess.square_file(move.from_square) - chess.square_file(king_sq)) <= 1:
-                if delta_cp < 0:
-                    return "This move weakens your king's pawn shelter and safety."
+    # Very rough king-safety heuristic: a pawn moving on or next to the king's file
+    king_sq = board.king(color)
+    if king_sq is not None and delta_cp < 0:
+        shelter = board.pawns & KING_SHELTER_FILES[chess.square_file(king_sq)]
+        if shelter & chess.BB_SQUARES[move.from_square]:
+            return "This move weakens your king's pawn shelter and safety."
 
     if bucket == "Hot":
         return "This move keeps the position close to the best engine line."
@@ -120,6 +395,67 @@ def quantise_delta(delta_cp: int, step: int = 50) -> int:
     return int(round(delta_cp / step)) * step
 
 
+# smoother, slightly wider buckets: a delta at or above a threshold moves
+# up to the next bucket
+BUCKET_THRESHOLDS = (-600, -300, -150, -50)
+BUCKETS = ("Freezing", "Cold", "Cool", "Warm", "Hot")
+
+
+def bucket_for(delta_cp: int) -> str:
+    """Map a (quantised) centipawn delta to its Hot..Freezing bucket."""
+    return BUCKETS[bisect.bisect_right(BUCKET_THRESHOLDS, delta_cp)]
+
+
+def evaluate_move(board: chess.Board,
+                  move: chess.Move,
+                  depth: int,
+                  client_id=None,
+                  engine=None) -> dict:
+    """
+    Compare a legal 'move' on 'board' with the engine's best line and
+    return the /api/eval-move payload. 'board' is left unchanged.
+    """
+    # one multi-line search from the current position scores both the best
+    # move and, in most cases, the user's move
+    lines = analyse_cached(board, depth, multipv=EVAL_MULTIPV,
+                           client_id=client_id, engine=engine)
+    best_cp = cp_from(lines[0], board.turn)
+
+    user_line = next((line for line in lines if line["pv"][:1] == [move]), None)
+    if user_line is None:
+        # user's move is outside the top lines: search after it instead,
+        # one ply shallower since the move itself is already played
+        board.push(move)
+        user_line = analyse_cached(board, max(1, depth - 1), engine=engine)[0]
+        board.pop()
+    user_cp = cp_from(user_line, board.turn)
+
+    delta_raw = user_cp - best_cp
+    delta = quantise_delta(delta_raw, step=50)  # snap to nearest 50 cp
+
+    bucket = bucket_for(delta)
+
+    label_map = {
+        "Hot": "Looks optimal",
+        "Warm": "Playable but not perfect",
+        "Cool": "Inaccuracy",
+        "Cold": "Clear mistake",
+        "Freezing": "Tactical blunder",
+    }
+    label = label_map[bucket]
+
+    reason = explain_move(board, move, delta, bucket)
+
+    return {
+        "bucket": bucket,
+        "deltaCp": int(delta),         # quantised
+        "message": label,
+        "userCp": int(user_cp),
+        "bestCp": int(best_cp),
+        "reason": reason,
+    }
+
+
 # ---------------- STATIC / ROOT ROUTES ----------------
 
 @app.route("/")
@@ -131,13 +467,13 @@ def root():
 @app.route("/img/<path:filename>")
 def serve_images(filename):
     """Serve piece images and other assets from static/img."""
-    return send_from_directory("static/img", filename)
+    return send_from_directory("static/img", filename, max_age=ASSET_MAX_AGE)
 
 
 @app.route("/favicon.ico")
 def favicon():
     """Serve favicon if present."""
-    return send_from_directory("static", "favicon.ico")
+    return send_from_directory("static", "favicon.ico", max_age=ASSET_MAX_AGE)
 
 
 # ---------------- API ROUTES ----------------
@@ -156,61 +492,61 @@ def eval_move():
     fen = data["fen"]
     uci = data["uci"]
     depth = int(data.get("depth", 12))
+    client_id = data.get("clientId")
 
-    board = chess.Board(fen)
+    board = game_board(client_id, fen)
     move = chess.Move.from_uci(uci)
 
-    if move not in board.legal_moves:
+    if not board.is_legal(move):
         return jsonify({"error": "Illegal move"}), 400
 
-    eng = get_engine()
+    return jsonify(evaluate_move(board, move, depth, client_id=client_id))
 
-    # eval best move from current position (before user move)
-    info_best = eng.analyse(board, chess.engine.Limit(depth=depth))
-    best_cp = cp_from(info_best, board.turn)
 
-    # eval position after user's move
-    board_after = board.copy()
-    board_after.push(move)
-    info_user = eng.analyse(board_after, chess.engine.Limit(depth=depth))
-    user_cp = cp_from(info_user, not board_after.turn)
-
-    delta_raw = user_cp - best_cp
-    delta = quantise_delta(delta_raw, step=50)  # snap to nearest 50 cp
-
-    # smoother, slightly wider buckets
-    if delta >= -50:
-        bucket = "Hot"
-    elif delta >= -150:
-        bucket = "Warm"
-    elif delta >= -300:
-        bucket = "Cool"
-    elif delta >= -600:
-        bucket = "Cold"
-    else:
-        bucket = "Freezing"
+@app.post("/api/eval-moves")
+def eval_moves():
+    """
+    Evaluate a batch of candidate moves, e.g. a stretch of a game:
+      payload: { positions: [ { fen, uci }, ... ], depth }
+               (at most MAX_BATCH_POSITIONS positions, so split longer
+               games into several batches; depth is capped at MAX_BATCH_DEPTH)
+      returns: { results: [...] } in request order, each like /api/eval-move
+    Positions are searched on one engine in game order, so positions from
+    the same game reuse each other's hash table entries.
+    """
+    data = request.get_json(force=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Expected a JSON object with 'positions'"}), 400
+    depth = max(1, min(int(data.get("depth", 12)), MAX_BATCH_DEPTH))
+
+    positions = data.get("positions")
+    if not isinstance(positions, list) or not all(
+        isinstance(p, dict) and "fen" in p and "uci" in p for p in positions
+    ):
+        return jsonify({"error": "'positions' must be a list of {fen, uci} objects"}), 400
+    if len(positions) > MAX_BATCH_POSITIONS:
+        return jsonify({"error": f"At most {MAX_BATCH_POSITIONS} positions per batch"}), 400
+
+    items = []
+    for idx, pos in enumerate(positions):
+        try:
+            board = parse_board(pos["fen"])
+            move = chess.Move.from_uci(pos["uci"])
+        except (TypeError, ValueError):
+            return jsonify({"error": f"Bad fen or uci at position {idx}"}), 400
+        if not board.is_legal(move):
+            return jsonify({"error": f"Illegal move at position {idx}"}), 400
+        items.append((idx, board, move))
 
-    label_map = {
-        "Hot": "Looks optimal",
-        "Warm": "Playable but not perfect",
-        "Cool": "Inaccuracy",
-        "Cold": "Clear mistake",
-        "Freezing": "Tactical blunder",
-    }
-    label = label_map[bucket]
+    # white's move before black's within each move number
+    items.sort(key=lambda item: (item[1].fullmove_number, item[1].turn == chess.BLACK))
 
-    reason = explain_move(board, board_after, move, delta, bucket)
+    results = [None] * len(items)
+    with with_engine() as engine:
+        for idx, board, move in items:
+            results[idx] = evaluate_move(board, move, depth, engine=engine)
 
-    return jsonify(
-        {
-            "bucket": bucket,
-            "deltaCp": int(delta),         # quantised
-            "message": label,
-            "userCp": int(user_cp),
-            "bestCp": int(best_cp),
-            "reason": reason,
-        }
-    )
+    return jsonify({"results": results})
 
 
 @app.post("/api/make-move")
@@ -221,21 +557,28 @@ def make_move():
     data = request.get_json(force=True)
     fen = data["fen"]
     uci = data["uci"]
+    client_id = data.get("clientId")
 
-    board = chess.Board(fen)
+    board = game_board(client_id, fen)
     move = chess.Move.from_uci(uci)
 
-    if move not in board.legal_moves:
+    if not board.is_legal(move):
         return jsonify({"error": "Illegal move"}), 400
 
     board.push(move)
 
+    # one terminality check instead of is_game_over() + result(); done
+    # before the board is shared, since repetition checks pop and re-push
+    outcome = board.outcome(claim_draw=False)
+    new_fen = board.fen()
+    remember_game(client_id, board)
+
     return jsonify(
         {
-            "fen": board.fen(),
+            "fen": new_fen,
             "turn": "white" if board.turn else "black",
-            "isGameOver": board.is_game_over(),
-            "result": board.result() if board.is_game_over() else None,
+            "isGameOver": outcome is not None,
+            "result": outcome.result() if outcome else None,
         }
     )
 
@@ -251,10 +594,10 @@ def best_move():
         return jsonify({"error": "Missing 'fen' parameter"}), 400
 
     depth = int(request.args.get("depth", 20))
+    client_id = request.args.get("clientId")
 
-    board = chess.Board(fen)
-    eng = get_engine()
-    info = eng.analyse(board, chess.engine.Limit(depth=depth))
+    board = game_board(client_id, fen)
+    info = analyse_cached(board, depth, client_id=client_id, early_exit=True)[0]
 
     pv = info.get("pv", [])
     san = board.san(pv[0]) if pv else None
@@ -262,6 +605,11 @@ def best_move():
     score = info["score"].pov(board.turn)
     mate_in = score.mate()  # plies to mate; positive if side to move mates
 
+    # the client plays the suggested move locally, so continue the game with it
+    if pv:
+        board.push(pv[0])
+        remember_game(client_id, board)
+
     return jsonify(
         {
             "bestSan": san,
@@ -290,34 +638,25 @@ def log_game():
     data["serverReceivedAt"] = datetime.utcnow().isoformat() + "Z"
 
     try:
-        with open(LOG_FILE, "a", encoding="utf-8") as f:
-            f.write(json.dumps(data) + "\n")
+        with open(LOG_FILE, "ab") as f:
+            f.write(orjson.dumps(data) + b"\n")
     except Exception as e:
         return jsonify({"error": f"Failed to write log: {e}"}), 500
 
     return jsonify({"status": "ok"})
 
 
-# ---------------- STOCKFISH TEST + MAIN ----------------
-
-def test_stockfish_once():
-    print("Testing Stockfish...")
-    try:
-        result = subprocess.run(
-            [STOCKFISH_PATH],
-            input="uci\nquit\n",
-            capture_output=True,
-            text=True,
-            timeout=5,
-        )
-        if result.returncode == 0:
-            print("Stockfish found!")
-        else:
-            print("Stockfish exited with non-zero status:", result.returncode)
-    except Exception as e:
-        print("Stockfish NOT found:", e)
-
+# ---------------- MAIN ----------------
 
 if __name__ == "__main__":
-    test_stockfish_once()
+    # starting the pool doubles as the Stockfish check and warms it up;
+    # the debug reloader runs this file twice, so only start it in the
+    # child process that actually serves requests
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        try:
+            start_engines()
+            print("Stockfish OK")
+        except Exception as e:
+            print("Stockfish NOT found:", e)
+            sys.exit(1)
     app.run(debug=True)
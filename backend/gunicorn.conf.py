@@ -0,0 +1,11 @@
+# gunicorn reads this file from the working directory automatically.
+
+
+def post_fork(server, worker):
+    """
+    Start this worker's engine pool right after the fork, so the first
+    request doesn't pay for spawning Stockfish. Doing it here rather than
+    at import keeps --preload safe: the master never owns any engines.
+    """
+    from app import start_engines
+    start_engines()
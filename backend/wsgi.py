@@ -0,0 +1,16 @@
+"""
+WSGI entry point for production servers.
+
+Run with threaded workers so engine-bound requests overlap:
+
+    gunicorn -k gthread --threads 8 -w 2 wsgi:app
+
+Avoid eventlet/gevent workers: they monkey-patch subprocess pipes,
+which breaks python-chess's communication with Stockfish.
+
+Engines are not started here: under --preload this module is imported
+in the gunicorn master, and forked workers can't use engines whose
+event-loop thread stayed behind. gunicorn.conf.py starts them per
+worker after the fork instead.
+"""
+from app import app  # noqa: F401
@@ -437,6 +437,7 @@ async function onDrop(source, target) {
         fen: fen(),
         uci,
         depth,
+        clientId,
       });
       evalCache.set(key, evalRes);
     }
@@ -483,7 +484,7 @@ async function playEngineMoveIfNeeded() {
   try {
     const url = `${API.bestMove}?fen=${encodeURIComponent(
       fen()
-    )}&depth=${bestMoveDepth()}`;
+    )}&depth=${bestMoveDepth()}&clientId=${encodeURIComponent(clientId)}`;
 
     const data = await (await fetch(url)).json();
     const bestSan = data.bestSan;
@@ -685,6 +686,7 @@ window.addEventListener("load", () => {
       const res = await postJSON(API.makeMove, {
         fen: fen(),
         uci: pending.uci,
+        clientId,
       });
 
       // add eval point